@@ -1,122 +1,292 @@
 import os
 import re
+import asyncio
+import base64
 import csv
 import io
+import random
+import socket
 import threading
 import time
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from slack_bolt import App
-from slack_bolt.adapter.socket_mode import SocketModeHandler
-from github import Github, GithubException, Auth  # <--- CHANGED: Added Auth import
+from datetime import datetime
+import aiohttp
+from slack_bolt.async_app import AsyncApp
+from slack_bolt.adapter.socket_mode.aiohttp import AsyncSocketModeHandler
+import ahocorasick
 import config
 
 # --- CONFIGURATION ---
 SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN", "").strip()
 SLACK_APP_TOKEN = os.environ.get("SLACK_APP_TOKEN", "").strip()
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "").strip()
+SLACK_WORKSPACE = os.environ.get("SLACK_WORKSPACE", "adeptmind").strip()
 
-GITHUB_REPO_NAME = "satvik-adeptmind/launch-tracker" 
+GITHUB_REPO_NAME = "satvik-adeptmind/launch-tracker"
+GITHUB_BRANCH = "main"
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
 CSV_FILENAME = "launches.csv"
+_STRFTIME_FMT = "%Y-%m-%d %H:%M:%S"
 
-app = App(token=SLACK_BOT_TOKEN)
+_GITHUB_HEADERS = {
+    "Authorization": f"bearer {GITHUB_TOKEN}",
+    "Accept": "application/vnd.github+json",
+}
+
+app = AsyncApp(token=SLACK_BOT_TOKEN)
+
+# --- PRE-COMPILED PATTERNS ---
+# Compiled once at import so parse_message never hits the regex compiler
+# (or re's LRU cache) on the hot path.
+# Runs against every message in every listening channel; the non-greedy
+# gap keeps backtracking bounded on long messages.
+_PROD_RE = re.compile(r"\d+\s*pages?.*?pushed\s+to\s+prod", re.IGNORECASE | re.DOTALL)
+_PAGE_RE = re.compile(r"(\d+)\s*pages?", re.IGNORECASE)
+_TRANCHE_RE = re.compile(r"(Tranche|T)[\s-]?(\d+)", re.IGNORECASE)
+# config.RETAILERS normalized exactly once: lowercase keywords in flat
+# tuples. Everything below (automaton, trigram set) is built from this,
+# so no per-message lowercasing or dict/list churn survives to runtime.
+_RETAILERS_FROZEN = tuple(
+    (official_name, tuple(k.lower() for k in keywords))
+    for official_name, keywords in config.RETAILERS.items()
+)
+# All retailer keywords in one Aho-Corasick automaton: matching is
+# O(len(text)) no matter how many retailers we add, vs. the old regex
+# alternation which still backtracked per keyword.
+_RETAILER_AUTOMATON = ahocorasick.Automaton()
+for _official_name, _keywords in _RETAILERS_FROZEN:
+    for _kw in _keywords:
+        _RETAILER_AUTOMATON.add_word(_kw, (_official_name, _kw))
+_RETAILER_AUTOMATON.make_automaton()
 
 # --- 1. HEALTH CHECK SERVER ---
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.end_headers()
-        self.wfile.write(b"Bot is alive!")
-    
-    # <--- CHANGED: Added do_HEAD to fix the 501 errors in logs
-    def do_HEAD(self):
-        self.send_response(200)
-        self.end_headers()
+# Platform probes only need a 200, so answer every connection with a
+# canned response and close: no request parsing, no per-request handler
+# objects, and any method (GET/HEAD/whatever) gets the same answer.
+_HEALTH_RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 13\r\nConnection: close\r\n\r\nBot is alive!"
 
 def start_health_check():
     port = int(os.environ.get("PORT", 8080))
-    server = HTTPServer(('0.0.0.0', port), HealthCheckHandler)
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('0.0.0.0', port))
+    server.listen(32)
     print(f"🌍 Fake web server running on port {port}")
-    server.serve_forever()
+    while True:
+        conn, _ = server.accept()
+        try:
+            # Don't let a client that connects but never sends wedge the
+            # single-threaded loop; socket.timeout is an OSError.
+            conn.settimeout(1)
+            conn.recv(1024)
+            conn.sendall(_HEALTH_RESPONSE)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+# --- HTTP SESSION ---
+# One aiohttp session for the whole process so every GitHub call reuses
+# the same connection pool instead of a fresh TLS handshake.
+_http_session = None
+
+async def _get_http_session():
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        # Small keep-alive pool: GitHub probes come every few seconds at
+        # most, so a handful of warm sockets avoids all repeat handshakes.
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=4, ttl_dns_cache=300, keepalive_timeout=75),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+    return _http_session
 
 # --- HELPER FUNCTIONS ---
 def parse_message(text):
-    count_match = re.search(r"(\d+)\s*pages?", text, re.IGNORECASE)
+    count_match = _PAGE_RE.search(text)
     page_count = count_match.group(1) if count_match else "0"
-    
-    tranche_match = re.search(r"(Tranche|T)[\s-]?(\d+)", text, re.IGNORECASE)
+
+    tranche_match = _TRANCHE_RE.search(text)
     tranche = f"T{tranche_match.group(2)}" if tranche_match else "Unknown"
-    
+
     text_lower = text.lower()
     retailer = "Unknown"
-    
-    for official_name, keywords in config.RETAILERS.items():
-        for keyword in keywords:
-            if re.search(r"\b" + re.escape(keyword) + r"\b", text_lower):
-                retailer = official_name
-                break
-        if retailer != "Unknown": break
-        
+
+    for end_idx, (official_name, keyword) in _RETAILER_AUTOMATON.iter(text_lower):
+        # The automaton finds raw substrings; enforce word boundaries so
+        # e.g. "evo" doesn't match inside "revolution".
+        start_idx = end_idx - len(keyword) + 1
+        before = text_lower[start_idx - 1] if start_idx > 0 else " "
+        after = text_lower[end_idx + 1] if end_idx + 1 < len(text_lower) else " "
+        if not before.isalnum() and not after.isalnum():
+            retailer = official_name
+            break
+
     return retailer, tranche, page_count
 
-def update_github_csv(new_row_list):
-    # <--- CHANGED: Updated Authentication method to fix DeprecationWarning
-    auth = Auth.Token(GITHUB_TOKEN)
-    g = Github(auth=auth)
-    
-    repo = g.get_repo(GITHUB_REPO_NAME)
-    
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
+# Last known state of the CSV plus the branch head oid. While the cache
+# is warm the only network op per log is a single createCommitOnBranch
+# mutation -- no GET at all. A rejected commit (someone else pushed)
+# invalidates the cache so the retry re-fetches.
+_csv_cache = {"head_oid": None, "data": None, "lock": asyncio.Lock()}
+
+_COMMIT_MUTATION = """
+mutation ($input: CreateCommitOnBranchInput!) {
+  createCommitOnBranch(input: $input) { commit { oid } }
+}
+"""
+
+async def _refresh_csv_cache(session):
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_REPO_NAME}/branches/{GITHUB_BRANCH}"
+    async with session.get(url, headers=_GITHUB_HEADERS) as response:
+        # Surface 401/404 (bad token, renamed repo) as a ClientError
+        # instead of KeyError-ing on the error payload below.
+        response.raise_for_status()
+        branch = await response.json()
+    _csv_cache["head_oid"] = branch["commit"]["sha"]
+
+    # vnd.github.raw returns the file body as-is: ~25% fewer bytes on the
+    # wire than the base64 JSON envelope and no decode step. The sha isn't
+    # needed here -- commits key off the branch head oid fetched above.
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_REPO_NAME}/contents/{CSV_FILENAME}"
+    raw_headers = dict(_GITHUB_HEADERS, Accept="application/vnd.github.raw")
+    async with session.get(url, headers=raw_headers) as response:
+        if response.status == 200:
+            _csv_cache["data"] = await response.text()
+        elif response.status == 404:
+            # File doesn't exist yet; the first commit will create it.
+            _csv_cache["data"] = "Date,Retailer,Tranche,Page_Count,Approver,Slack_Link\n"
+        else:
+            # Anything else (5xx, rate-limit 403) must NOT be treated as
+            # "empty file": createCommitOnBranch replaces contents
+            # wholesale, so committing the header fallback over a real
+            # file would wipe the history. Fail the batch instead.
+            response.raise_for_status()
+
+async def update_github_csv(new_rows):
+    session = await _get_http_session()
+
+    max_retries = 6
+    async with _csv_cache["lock"]:
+        for attempt in range(max_retries):
             try:
-                file_content = repo.get_contents(CSV_FILENAME)
-                csv_data = file_content.decoded_content.decode("utf-8")
-                sha = file_content.sha
-                file_exists = True
-            except:
-                csv_data = "Date,Retailer,Tranche,Page_Count,Approver,Slack_Link\n"
-                sha = None
-                file_exists = False
-
-            output = io.StringIO()
-            # Write existing data first
-            if file_exists:
-                output.write(csv_data)
-                if not csv_data.endswith("\n"):
-                    output.write("\n")
-            
-            # Append new row
-            writer = csv.writer(output)
-            writer.writerow(new_row_list)
-            updated_content = output.getvalue()
-
-            commit_message = f"Log: {new_row_list[1]} by {new_row_list[4]}"
-            
-            if file_exists:
-                repo.update_file(CSV_FILENAME, commit_message, updated_content, sha)
-            else:
-                repo.create_file(CSV_FILENAME, commit_message, updated_content)
-            
-            print(f"✅ Successfully logged to GitHub: {new_row_list}")
-            return True
-
-        except GithubException as e:
-            if e.status == 409:
-                print(f"⚠️ Concurrency conflict (Attempt {attempt+1}). Retrying...")
-                time.sleep(1)
-                continue
-            else:
-                print(f"❌ GitHub Error: {e}")
+                if _csv_cache["head_oid"] is None:
+                    await _refresh_csv_cache(session)
+                csv_data = _csv_cache["data"]
+
+                # Format only the new rows; csv.writer is just for escaping.
+                # Concatenating avoids copying the whole file through StringIO.
+                buf = io.StringIO()
+                csv.writer(buf).writerows(new_rows)
+                rows_str = buf.getvalue()
+                updated_content = csv_data + ("" if not csv_data or csv_data.endswith("\n") else "\n") + rows_str
+
+                if len(new_rows) == 1:
+                    commit_message = f"Log: {new_rows[0][1]} by {new_rows[0][4]}"
+                else:
+                    commit_message = f"Log batch of {len(new_rows)} launches"
+                variables = {"input": {
+                    "branch": {"repositoryNameWithOwner": GITHUB_REPO_NAME, "branchName": GITHUB_BRANCH},
+                    "message": {"headline": commit_message},
+                    "expectedHeadOid": _csv_cache["head_oid"],
+                    "fileChanges": {"additions": [{
+                        "path": CSV_FILENAME,
+                        "contents": base64.b64encode(updated_content.encode("utf-8")).decode("ascii"),
+                    }]},
+                }}
+                async with session.post(
+                    GITHUB_GRAPHQL_URL,
+                    json={"query": _COMMIT_MUTATION, "variables": variables},
+                    headers={"Authorization": f"bearer {GITHUB_TOKEN}"},
+                ) as response:
+                    status = response.status
+                    retry_after = response.headers.get("Retry-After")
+                    result = await response.json() if status == 200 else {}
+
+                if status == 429:
+                    delay = int(retry_after or "1")
+                    print(f"⚠️ Rate limited (Attempt {attempt+1}). Waiting {delay}s...")
+                    await asyncio.sleep(delay)
+                    continue
+
+                if result.get("errors") or "data" not in result:
+                    # Stale head oid (concurrent push) or transient API error.
+                    # Exponential backoff with jitter so retries don't
+                    # synchronize and re-collide.
+                    print(f"⚠️ Commit rejected (Attempt {attempt+1}): {result.get('errors') or status}. Retrying...")
+                    _csv_cache["head_oid"] = None
+                    _csv_cache["data"] = None
+                    await asyncio.sleep(min(2 ** attempt + random.random(), 10))
+                    continue
+
+                _csv_cache["head_oid"] = result["data"]["createCommitOnBranch"]["commit"]["oid"]
+                _csv_cache["data"] = updated_content
+
+                print(f"✅ Successfully logged to GitHub: {len(new_rows)} row(s)")
+                return True
+
+            except (aiohttp.ClientError, asyncio.TimeoutError, KeyError) as e:
+                print(f"❌ GitHub Error: {e!r}")
                 return False
     return False
 
+# --- WRITE QUEUE ---
+# All GitHub writes flow through one worker task, so commits are
+# naturally serialized (no head-oid races between confirmations) and a
+# burst of clicks doesn't spawn a thread each. maxsize bounds the
+# backlog instead of letting it grow without limit.
+_write_queue = asyncio.Queue(maxsize=256)
+
+async def _process_writes(jobs):
+    # One commit for however many confirmations were queued.
+    success = await update_github_csv([row for row, _, _ in jobs])
+
+    for row, body, client in jobs:
+        retailer = row[1]
+        approver_id = body['user']['id']
+
+        if success:
+            await client.chat_update(
+                channel=body['channel']['id'],
+                ts=body['message']['ts'],
+                text="Logged!",
+                blocks=[{"type": "section", "text": {"type": "mrkdwn", "text": f"✅ *Logged* by <@{approver_id}> for {retailer}"}}]
+            )
+        else:
+            await client.chat_postMessage(
+                channel=body['channel']['id'],
+                thread_ts=body['message']['thread_ts'],
+                text=f"❌ Failed to log to GitHub. Please check bot logs."
+            )
+
+async def _write_worker():
+    while True:
+        jobs = [await _write_queue.get()]
+        # Debounce briefly so a burst of confirmations lands as one commit.
+        deadline = time.monotonic() + 0.5
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(await asyncio.wait_for(_write_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await _process_writes(jobs)
+        except Exception as e:
+            print(f"❌ Write worker error: {e}")
+        finally:
+            for _ in jobs:
+                _write_queue.task_done()
+
 # --- SLACK LOGIC ---
-@app.message(re.compile(r"\d+\s*pages?.*pushed\s+to\s+prod", re.IGNORECASE | re.DOTALL))
-def handle_prod_message(message, say):
+@app.message(_PROD_RE)
+async def handle_prod_message(message, say):
     text = message.get('text', '')
     user_id = message['user']
     retailer, tranche, page_count = parse_message(text)
-    
+
     blocks = [
         {"type": "section", "text": {"type": "mrkdwn", "text": f"🚀 *Prod Launch Detected!*"}},
         {"type": "section", "fields": [
@@ -130,56 +300,65 @@ def handle_prod_message(message, say):
         ]}
     ]
     # <--- CHANGED: Added text argument to fix UserWarning
-    say(blocks=blocks, text=f"Prod Launch Detected: {retailer}", thread_ts=message['ts'])
+    await say(blocks=blocks, text=f"Prod Launch Detected: {retailer}", thread_ts=message['ts'])
+
+# Approver names essentially never change; cache the id -> real-name
+# mapping for an hour so repeat confirmations skip the Slack lookup.
+_user_cache = {}
+_USER_CACHE_TTL = 3600
+
+async def _get_user_name(client, user_id):
+    now = time.time()
+    entry = _user_cache.get(user_id)
+    if entry and now - entry[0] < _USER_CACHE_TTL:
+        return entry[1]
+    user_info = await client.users_info(user=user_id)
+    name = user_info['user']['real_name']
+    _user_cache[user_id] = (now, name)
+    return name
+
+async def _get_permalink(client, channel, message_ts):
+    # Permalinks are deterministic, so build one locally instead of paying
+    # a Slack round-trip; the API stays as a fallback.
+    if SLACK_WORKSPACE:
+        return f"https://{SLACK_WORKSPACE}.slack.com/archives/{channel}/p{message_ts.replace('.', '')}"
+    try:
+        permalink_res = await client.chat_getPermalink(channel=channel, message_ts=message_ts)
+        return permalink_res['permalink']
+    except:
+        return "Link not found"
 
 @app.action("confirm_launch")
-def handle_confirmation(ack, body, client):
-    ack()
-    
+async def handle_confirmation(ack, body, client):
+    await ack()
+
     data = body['actions'][0]['value'].split('|')
     retailer, tranche, count, original_user_id = data
     approver_id = body['user']['id']
-    
-    user_info = client.users_info(user=approver_id)
-    approver_name = user_info['user']['real_name']
-    
-    try:
-        permalink_res = client.chat_getPermalink(channel=body['channel']['id'], message_ts=body['message']['thread_ts'])
-        slack_link = permalink_res['permalink']
-    except:
-        slack_link = "Link not found"
 
-    from datetime import datetime
-    date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+    # The name lookup and permalink fetch are independent; overlap them.
+    approver_name, slack_link = await asyncio.gather(
+        _get_user_name(client, approver_id),
+        _get_permalink(client, body['channel']['id'], body['message']['thread_ts']),
+    )
+
+    date_str = datetime.now().strftime(_STRFTIME_FMT)
+
     row = [date_str, retailer, tranche, count, approver_name, slack_link]
-    
-    def background_update():
-        success = update_github_csv(row)
-        
-        if success:
-            client.chat_update(
-                channel=body['channel']['id'],
-                ts=body['message']['ts'],
-                text="Logged!",
-                blocks=[{"type": "section", "text": {"type": "mrkdwn", "text": f"✅ *Logged* by <@{approver_id}> for {retailer}"}}]
-            )
-        else:
-            client.chat_postMessage(
-                channel=body['channel']['id'],
-                thread_ts=body['message']['thread_ts'],
-                text=f"❌ Failed to log to GitHub. Please check bot logs."
-            )
 
-    threading.Thread(target=background_update).start()
+    await _write_queue.put((row, body, client))
 
 @app.action("ignore_launch")
-def handle_ignore(ack, body, client):
-    ack()
-    client.chat_delete(channel=body['channel']['id'], ts=body['message']['ts'])
+async def handle_ignore(ack, body, client):
+    await ack()
+    await client.chat_delete(channel=body['channel']['id'], ts=body['message']['ts'])
+
+async def main():
+    asyncio.create_task(_write_worker())
+    handler = AsyncSocketModeHandler(app, SLACK_APP_TOKEN)
+    await handler.start_async()
 
 if __name__ == "__main__":
     threading.Thread(target=start_health_check, daemon=True).start()
     print("⚡️ Bot is running...")
-    handler = SocketModeHandler(app, SLACK_APP_TOKEN)
-    handler.start()
+    asyncio.run(main())
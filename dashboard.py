@@ -1,18 +1,18 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import requests
-import io
-import os
-from github import Github, Auth
 import config
+from data import load_launches, save_data_to_github
 
-# --- CONFIGURATION ---
-GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "").strip()
-REPO_NAME = "satvik-adeptmind/launch-tracker"
-CSV_FILE_PATH = "launches.csv"
-CSV_URL = f"https://raw.githubusercontent.com/{REPO_NAME}/main/{CSV_FILE_PATH}"
+# Static for the life of the process: the retailer universe and the
+# schedule table, built once instead of per rerun.
+ALL_RETAILERS = tuple(sorted(config.RETAILERS))
+SCHEDULE_DF = pd.DataFrame({
+    'Retailer': ALL_RETAILERS,
+    'Schedule/Note': [config.RETAILER_INFO.get(r, 'Monthly') for r in ALL_RETAILERS],
+}).astype({'Retailer': 'category'})
 
 st.set_page_config(page_title="Launch Analytics", page_icon="🚀", layout="wide")
 
@@ -23,52 +23,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- HELPER: LOAD DATA ---
-@st.cache_data(ttl=60)
-def load_data():
-    try:
-        headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-        response = requests.get(CSV_URL, headers=headers)
-
-        if response.status_code != 200:
-            st.error(f"GitHub Error: Could not access the CSV file (Status: {response.status_code}).")
-            st.warning("Please check your GITHUB_TOKEN secret in the Streamlit app settings.")
-            return pd.DataFrame(columns=["Date", "Retailer", "Tranche", "Page_Count", "Approver", "Slack_Link"])
-
-        csv_content = response.content.decode('utf-8')
-        df = pd.read_csv(io.StringIO(csv_content))
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['Page_Count'] = pd.to_numeric(df['Page_Count'], errors='coerce').fillna(0)
-        return df
-
-    except Exception as e:
-        st.error(f"Parsing Error: The launches.csv file might be corrupted.")
-        st.warning(f"Please check the file format on GitHub. Details: {e}")
-        return pd.DataFrame(columns=["Date", "Retailer", "Tranche", "Page_Count", "Approver", "Slack_Link"])
-
-# --- HELPER: SAVE DATA ---
-def save_data_to_github(df_to_save):
-    try:
-        df_copy = df_to_save.copy()
-        df_copy['Date'] = pd.to_datetime(df_copy['Date']).dt.strftime("%Y-%m-%d %H:%M:%S")
-        
-        csv_buffer = io.StringIO()
-        df_copy.to_csv(csv_buffer, index=False)
-        new_content = csv_buffer.getvalue()
-
-        auth = Auth.Token(GITHUB_TOKEN)
-        g = Github(auth=auth)
-        repo = g.get_repo(REPO_NAME)
-        
-        contents = repo.get_contents(CSV_FILE_PATH)
-        repo.update_file(contents.path, "Manual Update via Dashboard", new_content, contents.sha)
-        
-        st.cache_data.clear()
-        return True
-    except Exception as e:
-        st.error(f"Error saving to GitHub: {e}")
-        return False
-
 # --- SIDEBAR ---
 st.sidebar.header("🔍 Filters")
 
@@ -78,11 +32,10 @@ if st.sidebar.button("🔄 Force Refresh Data"):
     st.sidebar.success("Cache cleared! Change a filter to see updates.")
 
 time_frame = st.sidebar.selectbox("Time Period", ["This Week", "Last Week", "This Month", "All Time"])
-all_retailers = sorted(config.RETAILERS.keys())
-selected_retailers = st.sidebar.multiselect("Select Retailers", options=all_retailers, default=all_retailers)
+selected_retailers = st.sidebar.multiselect("Select Retailers", options=ALL_RETAILERS, default=ALL_RETAILERS)
 
 # --- Load Data (main call) ---
-df = load_data()
+df, daily = load_launches()
 
 # --- DATE LOGIC ---
 today = datetime.now()
@@ -100,18 +53,70 @@ elif time_frame == "This Month":
     start_date = today.replace(day=1)
     previous_start_date = (start_date - timedelta(days=1)).replace(day=1)
 
+def _retailer_mask(col, selected):
+    # O(1) branchless membership test: one bit per retailer keyed by the
+    # categorical code, evaluated as a vectorized shift+and over the
+    # codes array -- no hash lookups. Falls back to isin if the category
+    # universe ever outgrows an int64 bitmask.
+    cats = col.cat.categories
+    if len(cats) > 63:
+        return col.isin(selected).to_numpy()
+    bits = 0
+    for r in selected:
+        if r in cats:
+            bits |= 1 << cats.get_loc(r)
+    codes = col.cat.codes.to_numpy().astype(np.int64)
+    valid = codes >= 0
+    return ((np.int64(bits) >> np.where(valid, codes, 0)) & 1).astype(bool) & valid
+
+# Keyed on the selection tuple, so flipping unrelated filters (e.g. the
+# time period) reuses the previously built view.
+@st.cache_data(show_spinner=False)
+def build_schedule_df(retailers):
+    return SCHEDULE_DF[_retailer_mask(SCHEDULE_DF['Retailer'], retailers)]
+
 # Apply Filters
 if not df.empty:
-    mask = (df['Date'] >= start_date) & (df['Retailer'].isin(selected_retailers))
-    if time_frame == "Last Week":
-        mask = mask & (df['Date'] < end_date)
-    df_filtered = df[mask]
-    
-    prev_mask = (df['Date'] >= previous_start_date) & (df['Date'] < start_date) & (df['Retailer'].isin(selected_retailers))
-    df_prev = df[prev_mask]
+    # The frame is Date-sorted, so each period is a contiguous slice
+    # found by binary search; the retailer test only touches the slice,
+    # not the full history.
+    dates = df['Date'].to_numpy()
+
+    # Window bounds as np.datetime64 scalars, built once and floored to
+    # day granularity: the cube is bucketed by day, so the raw slices
+    # must use the same bounds or the logs tab and tab1 metrics disagree
+    # about which launches fall in the window.
+    start_np = np.datetime64(start_date, 'D')
+    prev_start_np = np.datetime64(previous_start_date, 'D')
+    end_np = np.datetime64(end_date, 'D') if time_frame == "Last Week" else None
+
+    lo = dates.searchsorted(start_np)
+    hi = dates.searchsorted(end_np) if end_np is not None else len(dates)
+    curr = df.iloc[lo:hi]
+    df_filtered = curr[_retailer_mask(curr['Retailer'], selected_retailers)]
+
+    prev_lo = dates.searchsorted(prev_start_np)
+    prev = df.iloc[prev_lo:lo]
+    df_prev = prev[_retailer_mask(prev['Retailer'], selected_retailers)]
+
+    # Slice the pre-aggregated cube with the same day-floored bounds,
+    # ANDing follow-up terms into the mask in place (out=) instead of
+    # allocating an intermediate bool array per term.
+    day_vals = daily['Day'].to_numpy()
+    daily_ok = _retailer_mask(daily['Retailer'], selected_retailers)
+    daily_mask = np.logical_and(daily_ok, day_vals >= start_np)
+    if end_np is not None:
+        np.logical_and(daily_mask, day_vals < end_np, out=daily_mask)
+    daily_prev_mask = np.logical_and(daily_ok, day_vals >= prev_start_np)
+    np.logical_and(daily_prev_mask, day_vals < start_np, out=daily_prev_mask)
+
+    daily_filtered = daily[daily_mask]
+    daily_prev = daily[daily_prev_mask]
 else:
     df_filtered = df
     df_prev = df
+    daily_filtered = daily
+    daily_prev = daily
 
 # --- MAIN DASHBOARD ---
 st.title(f"🚀 Dashboard: {time_frame}")
@@ -120,43 +125,51 @@ st.title(f"🚀 Dashboard: {time_frame}")
 tab1, tab2, tab3, tab4 = st.tabs(["📊 Trends", "ℹ️ Schedules", "📝 Logs", "🛠 Manage Data"])
 
 with tab1:
-    if df_filtered.empty:
+    if daily_filtered.empty:
         st.info("No launches found for this period.")
     else:
-        curr_pages = df_filtered['Page_Count'].sum()
-        curr_launches = len(df_filtered)
-        curr_retailers = df_filtered['Retailer'].nunique()
-        prev_pages = df_prev['Page_Count'].sum()
-        prev_launches = len(df_prev)
-        
+        curr_pages = daily_filtered['pages'].sum()
+        curr_launches = int(daily_filtered['launches'].sum())
+        curr_retailers = daily_filtered['Retailer'].nunique()
+        prev_pages = daily_prev['pages'].sum()
+        prev_launches = int(daily_prev['launches'].sum())
+
         c1, c2, c3, c4 = st.columns(4)
         c1.metric("Total Pages", f"{int(curr_pages):,}", delta=f"{int(curr_pages - prev_pages)}")
         c2.metric("Total Launches", curr_launches, delta=f"{curr_launches - prev_launches}")
         c3.metric("Active Retailers", curr_retailers)
         c4.metric("Avg Pages", int(curr_pages / curr_launches) if curr_launches > 0 else 0)
-        
+
         st.markdown("---")
-        
+
         col1, col2 = st.columns([2, 1])
         with col1:
-            daily_counts = df_filtered.groupby(df_filtered['Date'].dt.date).size().reset_index(name='Launches')
-            fig_timeline = px.bar(daily_counts, x='Date', y='Launches', title="Daily Launch Frequency", color_discrete_sequence=['#00CC96'])
+            # go.Bar on raw arrays skips Plotly Express's DataFrame
+            # introspection and tidy-data copy -- the dominant cost for
+            # charts this small.
+            daily_counts = daily_filtered.groupby('Day')['launches'].sum()
+            fig_timeline = go.Figure(go.Bar(x=daily_counts.index.to_numpy(), y=daily_counts.to_numpy(), marker_color='#00CC96'))
+            fig_timeline.update_layout(title="Daily Launch Frequency", xaxis_title='Date', yaxis_title='Launches')
             st.plotly_chart(fig_timeline, use_container_width=True)
         with col2:
-            retailer_counts = df_filtered.groupby('Retailer')['Page_Count'].sum().reset_index().sort_values('Page_Count', ascending=True)
-            fig_retailer = px.bar(retailer_counts, x='Page_Count', y='Retailer', orientation='h', text_auto='.2s', color='Page_Count', color_continuous_scale='Bluered')
+            retailer_counts = daily_filtered.groupby('Retailer', observed=True)['pages'].sum().sort_values()
+            pages = retailer_counts.to_numpy()
+            fig_retailer = go.Figure(go.Bar(
+                x=pages, y=retailer_counts.index.to_numpy(), orientation='h',
+                texttemplate='%{x:.2s}', marker=dict(color=pages, colorscale='Bluered'),
+            ))
             fig_retailer.update_layout(showlegend=False)
             st.plotly_chart(fig_retailer, use_container_width=True)
 
 with tab2:
     st.subheader("ℹ️ Retailer Schedules")
-    schedule_data = [{"Retailer": r, "Schedule/Note": config.RETAILER_INFO.get(r, "Monthly")} for r in selected_retailers]
-    st.dataframe(pd.DataFrame(schedule_data), hide_index=True, use_container_width=True)
+    st.dataframe(build_schedule_df(tuple(selected_retailers)), hide_index=True, use_container_width=True)
 
 with tab3:
     st.subheader("📝 Launch Logs (Read Only)")
     st.dataframe(
-        df_filtered.sort_values("Date", ascending=False),
+        # Already Date-sorted ascending; reversing is a view, not a sort.
+        df_filtered.iloc[::-1],
         column_config={
             "Slack_Link": st.column_config.LinkColumn("Link", display_text="View"),
             "Date": st.column_config.DatetimeColumn("Date", format="D MMM, HH:mm"),
@@ -172,7 +185,7 @@ with tab4:
     with st.expander("➕ Add Missing Launch"):
         with st.form("add_launch_form"):
             c1, c2 = st.columns(2)
-            new_retailer = c1.selectbox("Retailer", options=all_retailers)
+            new_retailer = c1.selectbox("Retailer", options=ALL_RETAILERS)
             new_tranche = c2.text_input("Tranche (e.g., T1)", value="T1")
             
             c3, c4 = st.columns(2)
@@ -195,14 +208,17 @@ with tab4:
     st.write("### ✏️ Edit or Delete Rows")
     st.info("Select rows and press 'Delete' on your keyboard to remove them. Double click cells to edit.")
     
-    df_sorted = df.sort_values("Date", ascending=False)
+    # The editor must accept values outside the observed categories
+    # (e.g. a retailer with no launches yet), and setting an unseen value
+    # on a Categorical raises -- so hand it plain object columns.
+    df_sorted = df.iloc[::-1].astype({'Retailer': object, 'Tranche': object, 'Approver': object})
     edited_df = st.data_editor(
         df_sorted,
         num_rows="dynamic",
         use_container_width=True,
         column_config={
             "Date": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm:ss"),
-            "Retailer": st.column_config.SelectboxColumn(options=all_retailers),
+            "Retailer": st.column_config.SelectboxColumn(options=ALL_RETAILERS),
         },
         key="data_editor"
     )
@@ -0,0 +1,186 @@
+import io
+import os
+import re
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import httpx
+import streamlit as st
+from github import Github, GithubException, Auth
+
+# --- CONFIGURATION ---
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "").strip()
+REPO_NAME = "satvik-adeptmind/launch-tracker"
+CSV_FILE_PATH = "launches.csv"
+CSV_URL = f"https://raw.githubusercontent.com/{REPO_NAME}/main/{CSV_FILE_PATH}"
+
+CSV_COLUMNS = ["Date", "Retailer", "Tranche", "Page_Count", "Approver", "Slack_Link"]
+DAILY_COLUMNS = ["Day", "Retailer", "pages", "launches"]
+
+# --- LOAD DATA ---
+# Last ETag + body seen from GitHub, shared by all sessions in this
+# worker. A 304 response carries no body, so unchanged refreshes cost
+# ~0 bytes and barely touch the rate limit.
+_etag_cache = {"etag": None, "bytes": None}
+
+# Long-lived HTTP/2 client: connection reuse means cache misses skip
+# the TCP+TLS handshake, and any concurrent fetches multiplex over the
+# same connection instead of opening their own.
+_SESSION = httpx.Client(
+    http2=True,
+    headers={"Authorization": f"token {GITHUB_TOKEN}"},
+    timeout=10,
+)
+
+# Time-gated so reruns inside the TTL don't block on a network round
+# trip at all; at most one conditional GET (usually a bodyless 304) per
+# 60s per worker.
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_csv_bytes():
+    headers = {}
+    if _etag_cache["etag"] is not None:
+        headers["If-None-Match"] = _etag_cache["etag"]
+    response = _SESSION.get(CSV_URL, headers=headers)
+
+    if response.status_code == 304:
+        return _etag_cache["bytes"]
+
+    if response.status_code != 200:
+        st.error(f"GitHub Error: Could not access the CSV file (Status: {response.status_code}).")
+        st.warning("Please check your GITHUB_TOKEN secret in the Streamlit app settings.")
+        return None
+
+    _etag_cache["etag"] = response.headers.get("ETag")
+    _etag_cache["bytes"] = response.content
+    return response.content
+
+# Target dtypes handed straight to PyArrow's CSV reader: timestamps and
+# int32 pages are converted during the (multithreaded, SIMD) parse, and
+# the dictionary-encoded string columns arrive as pandas categoricals.
+_ARROW_CONVERT = pacsv.ConvertOptions(column_types={
+    'Date': pa.timestamp('s'),
+    'Page_Count': pa.int32(),
+    # The CSV reader only supports int32 dictionary indices.
+    'Retailer': pa.dictionary(pa.int32(), pa.string()),
+    'Tranche': pa.dictionary(pa.int32(), pa.string()),
+    'Approver': pa.dictionary(pa.int32(), pa.string()),
+})
+
+# Fallback when Page_Count has a non-numeric cell (hand-edited on
+# GitHub, pasted into the editor, ...): parse it as a string and coerce
+# afterwards instead of blanking the whole dashboard over one bad value.
+_ARROW_CONVERT_LAX = pacsv.ConvertOptions(column_types={
+    **_ARROW_CONVERT.column_types,
+    'Page_Count': pa.string(),
+})
+
+def _parquet_path(etag):
+    tag = re.sub(r"\W+", "", etag or "")
+    return os.path.join(tempfile.gettempdir(), f"launches_{tag}.parquet")
+
+# Cached on the CSV bytes themselves: as long as GitHub's copy is
+# unchanged, reruns reuse the parsed DataFrame and skip parsing entirely.
+#
+# The returned frames are immutable by contract: st.cache_data hands out
+# copies, but callers must still treat them as read-only -- derive new
+# frames (assign/concat/slices) rather than mutating in place, so the
+# copy-on-return tier stays the only per-rerun cost. The legacy st.cache
+# (which deep-hashed the returned object on every lookup) is deliberately
+# not used anywhere in this app.
+@st.cache_data(ttl=60, show_spinner=False)
+def _parse_csv(csv_bytes, etag):
+    try:
+        path = _parquet_path(etag) if etag else None
+        if path and os.path.exists(path):
+            # Cold restart / redeploy with unchanged content: columnar
+            # read with all dtypes preserved, far cheaper than reparsing.
+            df = pd.read_parquet(path)
+        else:
+            try:
+                table = pacsv.read_csv(io.BytesIO(csv_bytes), convert_options=_ARROW_CONVERT)
+                df = table.to_pandas()
+            except pa.ArrowInvalid:
+                # One bad Page_Count cell shouldn't take the whole
+                # dashboard down; re-read lax and coerce like the old
+                # pandas path did (bad cells become 0).
+                table = pacsv.read_csv(io.BytesIO(csv_bytes), convert_options=_ARROW_CONVERT_LAX)
+                df = table.to_pandas()
+                df['Page_Count'] = (
+                    pd.to_numeric(df['Page_Count'], errors='coerce').fillna(0).astype('int32')
+                )
+            # Keep the frame Date-sorted so time windows can be located
+            # by binary search instead of scanning every row per rerun.
+            df = df.sort_values('Date').reset_index(drop=True)
+            if path:
+                # One parquet per ETag; drop files from older revisions.
+                for old in os.listdir(tempfile.gettempdir()):
+                    if old.startswith("launches_") and old.endswith(".parquet"):
+                        try:
+                            os.remove(os.path.join(tempfile.gettempdir(), old))
+                        except OSError:
+                            pass
+                df.to_parquet(path, compression="zstd")
+        # The trends tab only ever aggregates by (day, retailer);
+        # building that cube once here means sidebar interactions
+        # re-group a frame of at most days x retailers rows instead of
+        # the raw history.
+        # Day buckets come from pure datetime64 truncation -- integer
+        # arithmetic in C, no per-row Python date objects to hash.
+        day = pd.Series(df['Date'].to_numpy().astype('datetime64[D]'), name='Day')
+        daily = (
+            df.groupby([day, 'Retailer'], observed=True)
+            .agg(pages=('Page_Count', 'sum'), launches=('Page_Count', 'size'))
+            .reset_index()
+        )
+        return df, daily
+
+    except Exception as e:
+        st.error(f"Parsing Error: The launches.csv file might be corrupted.")
+        st.warning(f"Please check the file format on GitHub. Details: {e}")
+        return pd.DataFrame(columns=CSV_COLUMNS), pd.DataFrame(columns=DAILY_COLUMNS)
+
+def load_launches():
+    csv_bytes = _fetch_csv_bytes()
+    if csv_bytes is None:
+        return pd.DataFrame(columns=CSV_COLUMNS), pd.DataFrame(columns=DAILY_COLUMNS)
+    return _parse_csv(csv_bytes, _etag_cache["etag"])
+
+# --- SAVE DATA ---
+def _github_repo():
+    # The repo handle is a live REST lookup; fetch it once per session
+    # instead of rebuilding client + repo on every save.
+    if "github_repo" not in st.session_state:
+        st.session_state.github_repo = Github(auth=Auth.Token(GITHUB_TOKEN)).get_repo(REPO_NAME)
+    return st.session_state.github_repo
+
+def save_data_to_github(df_to_save):
+    try:
+        # Only Date needs reformatting; assign() shallow-copies so the
+        # other columns share their buffers instead of being duplicated.
+        date_str = pd.to_datetime(df_to_save['Date']).dt.strftime("%Y-%m-%d %H:%M:%S")
+
+        # to_csv with no buffer returns the string in one allocation.
+        new_content = df_to_save.assign(Date=date_str).to_csv(index=False)
+
+        repo = _github_repo()
+        sha = st.session_state.get("csv_sha")
+        if sha is None:
+            sha = repo.get_contents(CSV_FILE_PATH).sha
+
+        try:
+            result = repo.update_file(CSV_FILE_PATH, "Manual Update via Dashboard", new_content, sha)
+        except GithubException as e:
+            if e.status != 409:
+                raise
+            # Cached sha went stale (the bot pushed in between); refetch
+            # and retry once.
+            sha = repo.get_contents(CSV_FILE_PATH).sha
+            result = repo.update_file(CSV_FILE_PATH, "Manual Update via Dashboard", new_content, sha)
+
+        st.session_state.csv_sha = result["content"].sha
+        st.cache_data.clear()
+        return True
+    except Exception as e:
+        st.error(f"Error saving to GitHub: {e}")
+        return False